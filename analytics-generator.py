@@ -1,200 +1,457 @@
-import pandas as pd
+import os
+from collections import Counter, deque
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
+from numpy.random import Generator, SFC64
 from datetime import datetime, timedelta
-import random
 import pyarrow as pa
+import pyarrow.compute as pc
 import pyarrow.parquet as pq
 
-# Set random seed for reproducibility
-np.random.seed(42)
-random.seed(42)
+# User segments for behavioral modeling: one row per segment with the inclusive
+# (lo, hi) bounds for daily sessions, session duration (minutes) and pages per session
+SEGMENT_NAMES = ['power_user', 'regular_user', 'casual_user']
+SEGMENT_P = [0.1, 0.6, 0.3]
+SEG_PARAMS = np.array([
+    [3, 8, 15, 45, 10, 30],  # power_user
+    [1, 3, 5, 20, 3, 10],    # regular_user
+    [0, 2, 2, 10, 1, 5]      # casual_user
+], dtype=np.int32)
+
+# Categorical columns are int8 codes into these lists; each list is paired with the
+# probabilities of its values in the same order, and codes are always looked up by
+# name, so the lists can be reordered or extended safely
+COUNTRIES = ['US', 'UK', 'CA', 'DE', 'FR', 'JP', 'AU']
+COUNTRY_P = [0.4, 0.15, 0.1, 0.1, 0.1, 0.1, 0.05]
+DEVICE_TYPES = ['mobile', 'desktop', 'tablet']
+DEVICE_P = [0.5, 0.4, 0.1]
+REFERRERS = ['google', 'facebook', 'direct', 'email', 'other']
+REFERRER_P = [0.3, 0.2, 0.3, 0.1, 0.1]
+PAGE_CATEGORIES = ['product', 'search', 'account', 'checkout', 'support']
+POWER_USER_PAGE_CATEGORY_P = [0.3, 0.3, 0.2, 0.15, 0.05]
+PAGE_CATEGORY_P = [0.4, 0.3, 0.1, 0.1, 0.1]
+
+# Parquet writer settings shared by all output files: column statistics and a page
+# index give readers min/max values to skip data when pushing filters down
+PARQUET_WRITE_OPTIONS = {
+    'use_dictionary': True,
+    'compression': 'zstd',
+    'compression_level': 3,
+    'write_statistics': True,
+    'data_page_size': 1 << 20,
+    'write_page_index': True
+}
+
+# Target rows per row group. Each write_table call starts a new row group, so the
+# small per-batch metrics tables are buffered up to this size before writing. The
+# event file keeps one row group per user batch (capped at this size) so that only
+# one batch is ever held in memory.
+ROW_GROUP_SIZE = 256_000
+
+# Explicit encodings replace the dictionary for these columns (the two cannot be
+# combined). event_id increases monotonically, so its deltas are tiny. timestamp is
+# not monotonic, since page views land at random times within their session, but
+# consecutive values stay within a session or a day of each other. With one row group
+# per user batch its dictionary pages barely repeat and come out larger than the deltas.
+EVENTS_COLUMN_ENCODING = {
+    'timestamp': 'DELTA_BINARY_PACKED',
+    'event_id': 'DELTA_BINARY_PACKED'
+}
+
+# Output schemas, declared once so every batch is written against the same layout
+EVENTS_SCHEMA = pa.schema([
+    ('event_id', pa.int64()),
+    ('user_id', pa.int32()),
+    ('session_id', pa.int64()),
+    ('timestamp', pa.timestamp('s')),
+    ('event_type', pa.dictionary(pa.int8(), pa.string())),
+    ('page_category', pa.dictionary(pa.int8(), pa.string())),
+    ('page_name', pa.dictionary(pa.int8(), pa.string())),
+    ('time_on_page', pa.uint16()),
+    ('bounce', pa.bool_()),
+    ('device_type', pa.dictionary(pa.int8(), pa.string())),
+    ('country', pa.dictionary(pa.int8(), pa.string())),
+    ('referrer', pa.dictionary(pa.int8(), pa.string())),
+    ('user_segment', pa.dictionary(pa.int8(), pa.string())),
+    ('revenue', pa.float64()),
+    ('date', pa.date32()),
+    ('hour', pa.uint8()),
+    ('day_of_week', pa.int8()),
+    ('is_weekend', pa.bool_())
+])
+
+DAILY_METRICS_SCHEMA = pa.schema([
+    ('date', pa.date32()),
+    ('user_id', pa.int32()),
+    ('sessions', pa.int64()),
+    ('page_views', pa.int64()),
+    ('total_time', pa.int64())
+])
+
+SESSION_METRICS_SCHEMA = pa.schema([
+    ('session_id', pa.int64()),
+    ('user_id', pa.int32()),
+    ('session_start', pa.timestamp('s')),
+    ('session_end', pa.timestamp('s')),
+    ('page_views', pa.int64()),
+    ('bounced', pa.bool_()),
+    ('device_type', pa.dictionary(pa.int8(), pa.string())),
+    ('country', pa.dictionary(pa.int8(), pa.string())),
+    ('referrer', pa.dictionary(pa.int8(), pa.string())),
+    ('session_duration', pa.float64())
+])
+
+def _fill_events(rng, segment_codes, days, start_s, first_user=0):
+    """
+    Expand per-user segment codes into per-event numeric columns
+    
+    Every segment-dependent draw is a single vectorized call with its bounds looked
+    up from SEG_PARAMS by segment code. segment_codes covers the users first_user,
+    first_user + 1, ... of the full population.
+    """
+    num_users = len(segment_codes)
+    
+    def draw(codes, column):
+        return rng.integers(SEG_PARAMS[codes, column], SEG_PARAMS[codes, column + 1] + 1)
+    
+    # Number of sessions for every user and day
+    sessions_per_user_day = draw(np.repeat(segment_codes, days), 0)
+    num_sessions = sessions_per_user_day.sum()
+    
+    # Session-level attributes, one entry per session in (user, day, session) order
+    session_user = np.repeat(np.repeat(np.arange(num_users), days), sessions_per_user_day)
+    session_day = np.repeat(np.tile(np.arange(days), num_users), sessions_per_user_day)
+    session_num = np.arange(num_sessions) - np.repeat(
+        np.cumsum(sessions_per_user_day) - sessions_per_user_day, sessions_per_user_day)
+    session_segment = segment_codes[session_user]
+    
+    # Times are int64 seconds since the epoch; sessions start at a random minute of their day
+    session_start = (start_s + session_day * 86400
+                     + rng.integers(0, 24 * 60, size=num_sessions) * 60)
+    session_duration = draw(session_segment, 2)
+    num_pages = draw(session_segment, 4)
+    converted = rng.random(num_sessions) < 0.1  # 10% conversion rate
+    
+    # Page views followed by an optional conversion event per session
+    events_per_session = num_pages + converted
+    total_events = events_per_session.sum()
+    session_offsets = np.cumsum(events_per_session) - events_per_session
+    event_session = np.repeat(np.arange(num_sessions), events_per_session)
+    event_user = session_user[event_session]
+    page_num = np.arange(total_events) - session_offsets[event_session]
+    is_conversion = page_num == num_pages[event_session]
+    conversion_idx = np.flatnonzero(is_conversion)
+    
+    # Packed integer IDs: session_id = user << 24 | day << 8 | session number,
+    # event_id = session_id << 8 | position in session (the conversion comes last)
+    session_ids = ((session_user + first_user).astype(np.int64) << 24) | (session_day << 8) | session_num
+    event_session_ids = session_ids[event_session]
+    event_ids = (event_session_ids << 8) | page_num
+    
+    # Page views land anywhere within the session, conversions at its end
+    duration = session_duration[event_session]
+    minutes = np.where(is_conversion, duration, rng.integers(0, duration + 1))
+    timestamps = session_start[event_session] + minutes * 60
+    
+    # Page categories based on user behavior
+    is_power = segment_codes[event_user] == SEGMENT_NAMES.index('power_user')
+    page_category_codes = np.empty(total_events, dtype=np.int8)
+    page_category_codes[is_power] = rng.choice(len(PAGE_CATEGORIES), size=is_power.sum(),
+                                               p=POWER_USER_PAGE_CATEGORY_P)
+    page_category_codes[~is_power] = rng.choice(len(PAGE_CATEGORIES), size=(~is_power).sum(),
+                                                p=PAGE_CATEGORY_P)
+    page_category_codes[conversion_idx] = PAGE_CATEGORIES.index('checkout')
+    page_idx = rng.integers(1, 11, size=total_events)
+    
+    time_on_page = rng.integers(10, 301, size=total_events, dtype=np.uint16)
+    time_on_page[conversion_idx] = 0
+    
+    # The referrer is how the session arrived, so it is drawn once per session and
+    # shared by all of its events, including the conversion
+    session_referrer = rng.choice(len(REFERRERS), size=num_sessions,
+                                  p=REFERRER_P).astype(np.int8)
+    referrer_codes = session_referrer[event_session]
+    
+    # Only the first page view of a single-page session counts as a bounce
+    bounce = np.zeros(total_events, dtype=bool)
+    bounce[session_offsets] = num_pages == 1
+    
+    revenue = np.full(total_events, np.nan)
+    revenue[conversion_idx] = np.round(rng.uniform(10, 500, size=len(conversion_idx)), 2)
+    
+    return {
+        'event_id': event_ids,
+        'user_id': event_user + first_user,
+        'session_id': event_session_ids,
+        'timestamp': timestamps,
+        'is_conversion': is_conversion,
+        'page_category': page_category_codes,
+        'page_idx': page_idx,
+        'time_on_page': time_on_page,
+        'bounce': bounce,
+        'referrer': referrer_codes,
+        'revenue': revenue
+    }
+
+def generate_event_batches(num_users=1000, days=30, users_per_batch=64, workers=None, seed=42):
+    """
+    Generate synthetic analytics events as a stream of tables, one per batch of users
+    """
+    
+    # Independent SFC64 streams spawned from one seed for reproducibility: the first
+    # draws the user profiles and each batch of users gets one of the others
+    batch_starts = range(0, num_users, users_per_batch)
+    profile_seed, *batch_seeds = np.random.SeedSequence(seed).spawn(len(batch_starts) + 1)
+    rng = Generator(SFC64(profile_seed))
+    
+    # Every page name is one of ten pages per category or the order confirmation,
+    # so page_name is a code into this list: category * 10 + page index
+    page_names = [f'{category}_page_{i}' for category in PAGE_CATEGORIES for i in range(1, 11)]
+    page_names.append('order_complete')
+    
+    # Generate user profiles (segment, country and device as int8 codes)
+    segment_codes = rng.choice(len(SEGMENT_NAMES), size=num_users, p=SEGMENT_P).astype(np.int8)
+    country_codes = rng.choice(len(COUNTRIES), size=num_users, p=COUNTRY_P).astype(np.int8)
+    device_codes = rng.choice(len(DEVICE_TYPES), size=num_users, p=DEVICE_P).astype(np.int8)
+    
+    start_s = np.datetime64(datetime.now() - timedelta(days=days), 's').astype(np.int64)
+    
+    # Low-cardinality columns stay as int8 codes over a small dictionary of values
+    def dictionary(codes, categories):
+        return pa.DictionaryArray.from_arrays(pa.array(codes, type=pa.int8()),
+                                              pa.array(categories, type=pa.string()))
+    
+    def build_batch(first_user, batch_seed):
+        batch_segments = segment_codes[first_user:first_user + users_per_batch]
+        events = _fill_events(Generator(SFC64(batch_seed)), batch_segments, days, start_s, first_user)
+        event_user = events['user_id']
+        
+        page_name_codes = events['page_category'] * 10 + (events['page_idx'] - 1)
+        page_name_codes[events['is_conversion']] = len(page_names) - 1
+        
+        timestamp = pa.array(events['timestamp'], type=pa.timestamp('s'))
+        return pa.Table.from_arrays([
+            pa.array(events['event_id'], type=pa.int64()),
+            pa.array(event_user, type=pa.int32()),
+            pa.array(events['session_id'], type=pa.int64()),
+            timestamp,
+            dictionary(events['is_conversion'].astype(np.int8), ['page_view', 'conversion']),
+            dictionary(events['page_category'], PAGE_CATEGORIES),
+            dictionary(page_name_codes, page_names),
+            pa.array(events['time_on_page'], type=pa.uint16()),
+            pa.array(events['bounce'], type=pa.bool_()),
+            dictionary(device_codes[event_user], DEVICE_TYPES),
+            dictionary(country_codes[event_user], COUNTRIES),
+            dictionary(events['referrer'], REFERRERS),
+            dictionary(segment_codes[event_user], SEGMENT_NAMES),
+            pa.array(events['revenue'], mask=~events['is_conversion'], type=pa.float64()),
+            *calculated_fields(timestamp)
+        ], schema=EVENTS_SCHEMA)
+    
+    # Batches are independent, so worker threads build them concurrently (most NumPy
+    # and Arrow kernels release the GIL) while the caller consumes them in order.
+    # Every batch draws from its own generator, so there is no shared RNG state and
+    # the output does not depend on scheduling. A new batch is submitted each time
+    # one is handed to the caller, keeping `workers` batches in flight at most.
+    workers = workers or os.cpu_count() or 1
+    pending = iter(zip(batch_starts, batch_seeds))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        in_flight = deque(executor.submit(build_batch, *args)
+                          for args in islice(pending, workers))
+        while in_flight:
+            batch = in_flight.popleft().result()
+            for args in islice(pending, 1):
+                in_flight.append(executor.submit(build_batch, *args))
+            yield batch
+
+def calculated_fields(timestamp):
+    """
+    Date, hour, day_of_week (Monday = 0) and is_weekend arrays for a timestamp array
+    """
+    day_of_week = pc.cast(pc.day_of_week(timestamp), pa.int8())
+    return [
+        pc.cast(pc.floor_temporal(timestamp, unit='day'), pa.date32()),
+        pc.cast(pc.hour(timestamp), pa.uint8()),
+        day_of_week,
+        pc.greater_equal(day_of_week, 5)
+    ]
 
 # Generate sample data
-def generate_analytics_data(num_users=1000, days=30):
+def generate_analytics_data(num_users=1000, days=30, seed=42):
     """
     Generate synthetic analytics data with realistic user behavior patterns
     """
+    batches = list(generate_event_batches(num_users, days, seed=seed))
+    if not batches:
+        return EVENTS_SCHEMA.empty_table()
+    return pa.concat_tables(batches)
+
+def aggregate_daily_metrics(events):
+    """
+    Daily user metrics; a (date, user) group never spans two user batches
     
-    # User segments for behavioral modeling
-    user_segments = {
-        'power_user': {'daily_sessions': (3, 8), 'session_duration': (15, 45), 'pages_per_session': (10, 30)},
-        'regular_user': {'daily_sessions': (1, 3), 'session_duration': (5, 20), 'pages_per_session': (3, 10)},
-        'casual_user': {'daily_sessions': (0, 2), 'session_duration': (2, 10), 'pages_per_session': (1, 5)}
-    }
+    A batch holds a contiguous range of users, so (user, date) maps onto a dense
+    index and every metric is a single sequential bincount rather than a hash
+    aggregation.
+    """
+    if events.num_rows == 0:
+        return DAILY_METRICS_SCHEMA.empty_table()
+    
+    user_id = events['user_id'].to_numpy()
+    date = pc.cast(events['date'], pa.int32()).to_numpy()
+    first_user, first_date = user_id.min(), date.min()
+    num_dates = date.max() - first_date + 1
+    day_key = (user_id - first_user).astype(np.int64) * num_dates + (date - first_date)
+    num_keys = (user_id.max() - first_user + 1) * num_dates
+    
+    page_views = np.bincount(day_key, minlength=num_keys)
+    total_time = np.bincount(day_key, weights=events['time_on_page'].to_numpy(),
+                             minlength=num_keys).astype(np.int64)
+    
+    # A session counts once on every date it has events on; sessions are contiguous
+    # runs of events, so number them in order and keep the distinct (session, date) pairs
+    session_id = events['session_id'].to_numpy()
+    session_num = np.cumsum(np.diff(session_id, prepend=session_id[:1]) != 0)
+    _, first_event = np.unique(session_num * num_dates + (date - first_date), return_index=True)
+    sessions = np.bincount(day_key[first_event], minlength=num_keys)
+    
+    active = np.flatnonzero(page_views)
+    return pa.Table.from_arrays([
+        pa.array((first_date + active % num_dates).astype(np.int32), type=pa.int32()).cast(pa.date32()),
+        pa.array(first_user + active // num_dates, type=pa.int32()),
+        pa.array(sessions[active], type=pa.int64()),
+        pa.array(page_views[active], type=pa.int64()),
+        pa.array(total_time[active], type=pa.int64())
+    ], schema=DAILY_METRICS_SCHEMA)
+
+def aggregate_session_metrics(events):
+    """
+    Session-level summaries; a session never spans two user batches
+    
+    The generator emits every session as one contiguous run of events, so each
+    metric is a single reduceat or take over the run starts, with no hashing.
+    """
+    session_id = events['session_id'].to_numpy()
+    starts = np.flatnonzero(np.diff(session_id, prepend=-1) != 0)
+    timestamp = pc.cast(events['timestamp'], pa.int64()).to_numpy()
+    session_start = np.minimum.reduceat(timestamp, starts)
+    session_end = np.maximum.reduceat(timestamp, starts)
     
-    # Generate user profiles
-    users = []
-    for i in range(num_users):
-        segment = np.random.choice(['power_user', 'regular_user', 'casual_user'], 
-                                  p=[0.1, 0.6, 0.3])
-        users.append({
-            'user_id': f'user_{i:04d}',
-            'segment': segment,
-            'acquisition_date': datetime.now() - timedelta(days=random.randint(30, 365)),
-            'country': np.random.choice(['US', 'UK', 'CA', 'DE', 'FR', 'JP', 'AU'], 
-                                      p=[0.4, 0.15, 0.1, 0.1, 0.1, 0.1, 0.05]),
-            'device_type': np.random.choice(['mobile', 'desktop', 'tablet'], 
-                                          p=[0.5, 0.4, 0.1])
-        })
-    
-    # Generate events
-    events = []
-    start_date = datetime.now() - timedelta(days=days)
-    
-    for user in users:
-        user_behavior = user_segments[user['segment']]
+    return pa.Table.from_arrays([
+        pa.array(session_id[starts], type=pa.int64()),
+        events['user_id'].take(starts),
+        pa.array(session_start, type=pa.timestamp('s')),
+        pa.array(session_end, type=pa.timestamp('s')),
+        pa.array(np.diff(starts, append=len(session_id)), type=pa.int64()),
+        pa.array(np.logical_or.reduceat(events['bounce'].to_numpy(), starts), type=pa.bool_()),
+        events['device_type'].take(starts),
+        events['country'].take(starts),
+        events['referrer'].take(starts),
+        pa.array((session_end - session_start) / 60, type=pa.float64())
+    ], schema=SESSION_METRICS_SCHEMA)
+
+def add_value_counts(totals, column):
+    """
+    Add the per-value counts of an Arrow column into a running Counter
+    """
+    for row in pc.value_counts(column).to_pylist():
+        totals[row['values']] += row['counts']
+
+def write_buffered(writer, buffer, table=None):
+    """
+    Buffer a table and write the buffer as one row group once it reaches
+    ROW_GROUP_SIZE rows; called without a table it flushes whatever is left
+    """
+    if table is not None:
+        buffer.append(table)
+    if buffer and (table is None or sum(t.num_rows for t in buffer) >= ROW_GROUP_SIZE):
+        writer.write_table(pa.concat_tables(buffer), row_group_size=ROW_GROUP_SIZE)
+        buffer.clear()
+
+def counts_table(counts, column, name):
+    return pa.table({column: [value for value, _ in counts], name: [count for _, count in counts]})
+
+# Generate the data and aggregated metrics one batch of users at a time, so only a
+# single batch is held in memory while the parquet files are written. The summary
+# is accumulated from the same batches: they hold disjoint sets of users and
+# sessions, so per-batch distinct counts simply add up.
+print("Generating analytics data and aggregated metrics...")
+num_events = num_daily_records = num_sessions = 0
+num_unique_users = num_conversions = 0
+total_revenue = 0.0
+first_date = last_date = None
+segment_users, device_events, page_views = Counter(), Counter(), Counter()
+sample = None
+daily_buffer, session_buffer = [], []
+
+with pq.ParquetWriter('analytics_events.parquet', EVENTS_SCHEMA, **{
+    **PARQUET_WRITE_OPTIONS,
+    'use_dictionary': [name for name in EVENTS_SCHEMA.names if name not in EVENTS_COLUMN_ENCODING],
+    'column_encoding': EVENTS_COLUMN_ENCODING
+}) as events_writer, \
+     pq.ParquetWriter('daily_user_metrics.parquet', DAILY_METRICS_SCHEMA,
+                      **PARQUET_WRITE_OPTIONS) as daily_writer, \
+     pq.ParquetWriter('session_metrics.parquet', SESSION_METRICS_SCHEMA,
+                      **PARQUET_WRITE_OPTIONS) as session_writer:
+    for events in generate_event_batches(num_users=1000, days=30):
+        daily_metrics = aggregate_daily_metrics(events)
+        session_metrics = aggregate_session_metrics(events)
         
-        for day in range(days):
-            current_date = start_date + timedelta(days=day)
-            
-            # Determine number of sessions for this day
-            num_sessions = random.randint(*user_behavior['daily_sessions'])
-            
-            for session in range(num_sessions):
-                session_id = f"{user['user_id']}_{current_date.strftime('%Y%m%d')}_{session}"
-                session_start = current_date + timedelta(
-                    hours=random.randint(0, 23),
-                    minutes=random.randint(0, 59)
-                )
-                session_duration = random.randint(*user_behavior['session_duration'])
-                
-                # Generate page views within session
-                num_pages = random.randint(*user_behavior['pages_per_session'])
-                
-                for page_num in range(num_pages):
-                    event_time = session_start + timedelta(
-                        minutes=random.randint(0, session_duration)
-                    )
-                    
-                    # Page categories based on user behavior
-                    if user['segment'] == 'power_user':
-                        page_category = np.random.choice(
-                            ['product', 'search', 'account', 'checkout', 'support'],
-                            p=[0.3, 0.3, 0.2, 0.15, 0.05]
-                        )
-                    else:
-                        page_category = np.random.choice(
-                            ['product', 'search', 'account', 'checkout', 'support'],
-                            p=[0.4, 0.3, 0.1, 0.1, 0.1]
-                        )
-                    
-                    event = {
-                        'event_id': f"{session_id}_{page_num}",
-                        'user_id': user['user_id'],
-                        'session_id': session_id,
-                        'timestamp': event_time,
-                        'event_type': 'page_view',
-                        'page_category': page_category,
-                        'page_name': f"{page_category}_page_{random.randint(1, 10)}",
-                        'time_on_page': random.randint(10, 300),
-                        'bounce': page_num == 0 and num_pages == 1,
-                        'device_type': user['device_type'],
-                        'country': user['country'],
-                        'referrer': np.random.choice(
-                            ['google', 'facebook', 'direct', 'email', 'other'],
-                            p=[0.3, 0.2, 0.3, 0.1, 0.1]
-                        ),
-                        'user_segment': user['segment']
-                    }
-                    events.append(event)
-                
-                # Add conversion events for some sessions
-                if random.random() < 0.1:  # 10% conversion rate
-                    conversion_event = {
-                        'event_id': f"{session_id}_conversion",
-                        'user_id': user['user_id'],
-                        'session_id': session_id,
-                        'timestamp': session_start + timedelta(minutes=session_duration),
-                        'event_type': 'conversion',
-                        'page_category': 'checkout',
-                        'page_name': 'order_complete',
-                        'time_on_page': 0,
-                        'bounce': False,
-                        'device_type': user['device_type'],
-                        'country': user['country'],
-                        'referrer': events[-1]['referrer'] if events else 'direct',
-                        'user_segment': user['segment'],
-                        'revenue': round(random.uniform(10, 500), 2)
-                    }
-                    events.append(conversion_event)
-    
-    return pd.DataFrame(events)
-
-# Generate the data
-print("Generating analytics data...")
-df = generate_analytics_data(num_users=1000, days=30)
-
-# Add some calculated fields
-df['date'] = df['timestamp'].dt.date
-df['hour'] = df['timestamp'].dt.hour
-df['day_of_week'] = df['timestamp'].dt.day_name()
-df['is_weekend'] = df['timestamp'].dt.dayofweek.isin([5, 6])
-
-# Create aggregated metrics
-print("\nGenerating aggregated metrics...")
-
-# Daily user metrics
-daily_metrics = df.groupby(['date', 'user_id']).agg({
-    'session_id': pd.Series.nunique,
-    'event_id': 'count',
-    'time_on_page': 'sum'
-}).reset_index()
-daily_metrics.columns = ['date', 'user_id', 'sessions', 'page_views', 'total_time']
-
-# Session metrics
-session_metrics = df.groupby('session_id').agg({
-    'user_id': 'first',
-    'timestamp': ['min', 'max'],
-    'event_id': 'count',
-    'bounce': 'any',
-    'device_type': 'first',
-    'country': 'first',
-    'referrer': 'first'
-}).reset_index()
-session_metrics.columns = ['session_id', 'user_id', 'session_start', 'session_end', 
-                          'page_views', 'bounced', 'device_type', 'country', 'referrer']
-session_metrics['session_duration'] = (
-    session_metrics['session_end'] - session_metrics['session_start']
-).dt.total_seconds() / 60
-
-# Save to parquet files
-print("\nSaving to parquet files...")
-
-# Event-level data
-pq.write_table(pa.Table.from_pandas(df), 'analytics_events.parquet')
-print(f"✓ Saved analytics_events.parquet - {len(df):,} events")
-
-# Daily aggregated data
-pq.write_table(pa.Table.from_pandas(daily_metrics), 'daily_user_metrics.parquet')
-print(f"✓ Saved daily_user_metrics.parquet - {len(daily_metrics):,} daily records")
-
-# Session-level data
-pq.write_table(pa.Table.from_pandas(session_metrics), 'session_metrics.parquet')
-print(f"✓ Saved session_metrics.parquet - {len(session_metrics):,} sessions")
+        events_writer.write_table(events, row_group_size=ROW_GROUP_SIZE)
+        write_buffered(daily_writer, daily_buffer, daily_metrics)
+        write_buffered(session_writer, session_buffer, session_metrics)
+        
+        num_events += events.num_rows
+        num_daily_records += daily_metrics.num_rows
+        num_sessions += session_metrics.num_rows
+        if events.num_rows == 0:
+            continue
+        
+        if sample is None:
+            sample = events.slice(0, 10)
+        num_unique_users += pc.count_distinct(events['user_id']).as_py()
+        date_range = pc.min_max(events['date']).as_py()
+        first_date = min(first_date or date_range['min'], date_range['min'])
+        last_date = max(last_date or date_range['max'], date_range['max'])
+        num_conversions += pc.sum(pc.equal(events['event_type'], 'conversion'), min_count=0).as_py()
+        total_revenue += pc.sum(events['revenue'], min_count=0).as_py()
+        for row in events.group_by('user_segment').aggregate([('user_id', 'count_distinct')]).to_pylist():
+            segment_users[row['user_segment']] += row['user_id_count_distinct']
+        add_value_counts(device_events, events['device_type'])
+        add_value_counts(page_views, events['page_name'])
+    
+    write_buffered(daily_writer, daily_buffer)
+    write_buffered(session_writer, session_buffer)
+
+print(f"✓ Saved analytics_events.parquet - {num_events:,} events")
+print(f"✓ Saved daily_user_metrics.parquet - {num_daily_records:,} daily records")
+print(f"✓ Saved session_metrics.parquet - {num_sessions:,} sessions")
 
 # Display sample data
 print("\n=== Sample Event Data ===")
-print(df.head(10))
+print(sample.to_pandas() if sample is not None else "(no events)")
 
 print("\n=== Data Summary ===")
-print(f"Total events: {len(df):,}")
-print(f"Unique users: {df['user_id'].nunique():,}")
-print(f"Unique sessions: {df['session_id'].nunique():,}")
-print(f"Date range: {df['date'].min()} to {df['date'].max()}")
-print(f"Conversion events: {len(df[df['event_type'] == 'conversion']):,}")
-print(f"Total revenue: ${df[df['event_type'] == 'conversion']['revenue'].sum():,.2f}")
+print(f"Total events: {num_events:,}")
+print(f"Unique users: {num_unique_users:,}")
+print(f"Unique sessions: {num_sessions:,}")
+print(f"Date range: {first_date} to {last_date}")
+print(f"Conversion events: {num_conversions:,}")
+print(f"Total revenue: ${total_revenue:,.2f}")
 
 print("\n=== User Segment Distribution ===")
-print(df.groupby('user_segment')['user_id'].nunique())
+print(counts_table(segment_users.items(), 'user_segment', 'users').to_pandas())
 
 print("\n=== Device Type Distribution ===")
-print(df.groupby('device_type')['event_id'].count())
+print(counts_table(device_events.items(), 'device_type', 'events').to_pandas())
 
 print("\n=== Top Pages ===")
-print(df['page_name'].value_counts().head(10))
+print(counts_table(page_views.most_common(10), 'page_name', 'count').to_pandas())
 
-# Example of reading the parquet file back
-print("\n=== Reading parquet file example ===")
-df_read = pd.read_parquet('analytics_events.parquet')
-print(f"Successfully read {len(df_read)} records from analytics_events.parquet")
-print(df_read.info())
\ No newline at end of file
+# Inspect the written file from its footer metadata only, without reading data pages
+print("\n=== Parquet file metadata ===")
+metadata = pq.ParquetFile('analytics_events.parquet').metadata
+print(f"analytics_events.parquet: {metadata.num_rows:,} rows in {metadata.num_row_groups} row groups, "
+      f"{os.path.getsize('analytics_events.parquet'):,} bytes")
+print(pq.read_schema('analytics_events.parquet'))